@@ -1,7 +1,13 @@
 import os
 import sys
 import re
+import functools
 import subprocess
+import threading
+try:
+    import fcntl
+except ImportError:
+    fcntl = None # not a POSIX platform
 try:
     from importlib import metadata as importlib_metadata # py3.8+ stdlib
 except ImportError:
@@ -20,6 +26,189 @@ class YosysError(Exception):
     pass
 
 
+_BUILTIN_VER_RE = re.compile(r"^(\d+)\.(\d+)(?:\.post(\d+))?")
+_SYSTEM_VER_RE  = re.compile(r"^Yosys (\d+)\.(\d+)(?:\+(\d+))?")
+_VERIFIC_HDR_RE = re.compile(r"\A(-- .+\n|\n)*")
+
+
+# Querying package metadata is surprisingly expensive: every call walks `sys.path` and parses
+# the package METADATA file from disk. The result cannot change within one interpreter run, so
+# cache it, as well as the (also filesystem-heavy) `PATH` lookup for the system binary.
+@functools.lru_cache(maxsize=None)
+def _dist_version(package):
+    if importlib_metadata is None:
+        return None
+    try:
+        version = importlib_metadata.version(package)
+    except importlib_metadata.PackageNotFoundError:
+        return None
+    match = _BUILTIN_VER_RE.match(version)
+    return (int(match[1]), int(match[2]), int(match[3] or 0))
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_has_tool(name):
+    return has_tool(name)
+
+
+@functools.lru_cache(maxsize=None)
+def _dist_script(package):
+    # The console script that *package* installs is somewhat cheaper to launch than
+    # `python -m package`: the wrapper starts an interpreter all the same, but skips the `-m`
+    # module search and runpy bootstrap. Returns None if the script cannot be located within
+    # the installation that provided the metadata; the `-m` launch path still works then.
+    if importlib_metadata is None:
+        return None
+    try:
+        dist = importlib_metadata.distribution(package)
+    except importlib_metadata.PackageNotFoundError:
+        return None
+    script = package.replace("_", "-")
+    if not any(entry_point.group == "console_scripts" and entry_point.name == script
+               for entry_point in dist.entry_points):
+        return None
+    # Resolve the script through the distribution's own file list rather than PATH: a bare
+    # which() lookup could find a same-named script from a different environment (system
+    # install next to a virtualenv, pyenv shims), making run() execute a different Yosys
+    # than the one version() just reported.
+    for file in dist.files or []:
+        if file.name in (script, script + ".exe"):
+            path = os.path.normpath(os.fspath(dist.locate_file(file)))
+            if os.access(path, os.X_OK):
+                return path
+    return None
+
+
+# Pipes are small by default (64 KiB on Linux, less elsewhere), while Yosys logs easily run into
+# megabytes; with a small pipe, Yosys stalls in pipe-full round trips against our reads. Request
+# a larger pipe where the platform allows it, and use fully buffered (not line buffered) streams.
+_PIPE_SIZE = 1024 * 1024
+_F_SETPIPE_SZ = 1031 # defined as fcntl.F_SETPIPE_SZ only on Python 3.10+, Linux-specific
+
+
+def _pipe_popen_kwargs():
+    kwargs = {"bufsize": -1}
+    if sys.version_info >= (3, 10) and fcntl is not None:
+        kwargs["pipesize"] = _PIPE_SIZE
+    return kwargs
+
+
+def _grow_pipes(popen):
+    # Fallback for Python before 3.10, where Popen has no `pipesize` argument.
+    if sys.version_info >= (3, 10) or fcntl is None:
+        return
+    for pipe in (popen.stdin, popen.stdout, popen.stderr):
+        if pipe is None:
+            continue
+        try:
+            fcntl.fcntl(pipe.fileno(), _F_SETPIPE_SZ, _PIPE_SIZE)
+        except OSError:
+            pass # F_SETPIPE_SZ unsupported, or pipe size limit reached
+
+
+def _communicate(popen, stdin):
+    """Like :meth:`subprocess.Popen.communicate`, but reads both pipes concurrently with writing
+    standard input, in large chunks, on dedicated threads. Yosys interleaves reading its script
+    with writing its log, so with large scripts and large logs, strictly sequential write-then-read
+    communication can deadlock regardless of pipe size.
+
+    ``popen`` must use binary pipes: the pipes are drained as raw bytes, so that multi-megabyte
+    logs are decoded in a single bulk pass at the end instead of incrementally by a text wrapper
+    on every read. Like a text wrapper, this translates Windows line endings, which Yosys emits
+    through its text-mode standard streams there; everything downstream anchors on ``\\n``."""
+    def drain(pipe, buffer):
+        fd = pipe.fileno()
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            buffer += chunk
+    stdout_buffer = bytearray()
+    stderr_buffer = bytearray()
+    stdout_thread = threading.Thread(target=drain, args=(popen.stdout, stdout_buffer))
+    stderr_thread = threading.Thread(target=drain, args=(popen.stderr, stderr_buffer))
+    stdout_thread.start()
+    stderr_thread.start()
+    if isinstance(stdin, str):
+        stdin = stdin.encode("utf-8")
+    try:
+        popen.stdin.write(stdin)
+        # Closing flushes the buffered writer, so it can raise EPIPE just like the write.
+        popen.stdin.close()
+    except BrokenPipeError:
+        pass # Yosys exited early; its error ends up on standard error anyway.
+    popen.wait()
+    stdout_thread.join()
+    stderr_thread.join()
+    return (stdout_buffer.decode("utf-8").replace("\r\n", "\n"),
+            stderr_buffer.decode("utf-8").replace("\r\n", "\n"))
+
+
+class _YosysSession:
+    """A single long-lived Yosys process, shared between script invocations.
+
+    Starting Yosys is expensive: it pays for process creation, and, for the builtin Yosys,
+    a complete Python interpreter startup and import of the Yosys wheel. A session starts Yosys
+    once in script-from-stdin mode and feeds it scripts one after another, delimited by
+    a sentinel ``log`` command, so that N invocations pay the startup cost only once.
+    """
+
+    _SENTINEL = "---nmigen-session-end---"
+
+    def __init__(self, argv):
+        self._popen = subprocess.Popen([*argv, "-"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            encoding="utf-8", **_pipe_popen_kwargs())
+        _grow_pipes(self._popen)
+        self._stderr_lines = []
+        # Drain standard error continuously; otherwise, a Yosys process that fills the pipe
+        # would block, deadlocking against our read of standard output.
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+
+    def _drain_stderr(self):
+        for line in self._popen.stderr:
+            self._stderr_lines.append(line)
+
+    def send(self, script):
+        """Run ``script`` in the session, and return its standard output.
+
+        Each script runs in a fresh design; state does not leak between invocations.
+        """
+        if self._popen.poll() is not None:
+            raise YosysError("Yosys session terminated unexpectedly")
+        try:
+            self._popen.stdin.write("design -reset\n")
+            self._popen.stdin.write(script)
+            self._popen.stdin.write("\nlog {}\n".format(self._SENTINEL))
+            self._popen.stdin.flush()
+        except BrokenPipeError:
+            pass # Yosys died during the write; the read below sees EOF and reports the error.
+        output = []
+        for line in self._popen.stdout:
+            if line.rstrip("\n") == self._SENTINEL:
+                return "".join(output)
+            output.append(line)
+        # Standard output was closed before the sentinel was seen: Yosys has died.
+        self._popen.wait()
+        self._stderr_thread.join()
+        raise YosysError("".join(self._stderr_lines).strip())
+
+    def close(self):
+        try:
+            self._popen.stdin.close()
+        except BrokenPipeError:
+            pass # Yosys already died; there is nothing left to flush.
+        self._popen.wait()
+        self._stderr_thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 class YosysBinary:
     @classmethod
     def available(cls):
@@ -56,8 +245,8 @@ class YosysBinary:
         ----------
         args : list of str
             Arguments, not including the program name.
-        stdin : str
-            Standard input.
+        stdin : str or bytes
+            Standard input. A :class:`str` is encoded as UTF-8 once, up front.
 
         Returns
         -------
@@ -72,32 +261,88 @@ class YosysBinary:
         """
         raise NotImplementedError
 
+    @classmethod
+    def run_scripts(cls, scripts):
+        """Run several Yosys scripts in a single Yosys process.
+
+        The scripts are concatenated, separated by ``design -reset`` and a sentinel ``log``
+        command, and fed to one Yosys invocation, so that N scripts pay for one process startup
+        rather than N. Each script runs in a fresh design; state does not leak between scripts.
+
+        Parameters
+        ----------
+        scripts : list of str
+            Yosys scripts.
+
+        Returns
+        -------
+        stdouts : list of str
+            Standard output of each script, in the same order.
+
+        Exceptions
+        ----------
+        YosysError
+            Raised if Yosys returns a non-zero code. Scripts after the failing one do not run.
+        """
+        script_parts = []
+        for index, script in enumerate(scripts):
+            if index:
+                script_parts.append("design -reset\n")
+            script_parts.append(script)
+            script_parts.append("\nlog ----script-{}-end----\n".format(index))
+        stdout = cls.run(["-"], "".join(script_parts))
+        stdouts = []
+        for index in range(len(scripts)):
+            output, found, stdout = stdout.partition("----script-{}-end----\n".format(index))
+            if not found:
+                raise YosysError("Yosys output is missing the delimiter of script {}"
+                                 .format(index))
+            stdouts.append(output)
+        return stdouts
+
+    @classmethod
+    def _argv(cls):
+        """Get argument vector that starts this Yosys binary, not including Yosys arguments."""
+        raise NotImplementedError
+
+    @classmethod
+    def session(cls):
+        """Start a reusable Yosys process.
+
+        Returns
+        -------
+        session : _YosysSession
+            Long-lived Yosys process accepting scripts via :meth:`_YosysSession.send`. Use as
+            a context manager, or call :meth:`_YosysSession.close` explicitly.
+        """
+        return _YosysSession(cls._argv())
+
 
 class _BuiltinYosys(YosysBinary):
     YOSYS_PACKAGE = "nmigen_yosys"
 
     @classmethod
     def available(cls):
-        if importlib_metadata is None:
-            return False
-        try:
-            importlib_metadata.version(cls.YOSYS_PACKAGE)
-            return True
-        except importlib_metadata.PackageNotFoundError:
-            return False
+        return _dist_version(cls.YOSYS_PACKAGE) is not None
 
     @classmethod
     def version(cls):
-        version = importlib_metadata.version(cls.YOSYS_PACKAGE)
-        match = re.match(r"^(\d+)\.(\d+)(?:\.post(\d+))?", version)
-        return (int(match[1]), int(match[2]), int(match[3] or 0))
+        return _dist_version(cls.YOSYS_PACKAGE)
+
+    @classmethod
+    def _argv(cls):
+        script = _dist_script(cls.YOSYS_PACKAGE)
+        if script is not None:
+            return [script]
+        return [sys.executable, "-m", cls.YOSYS_PACKAGE]
 
     @classmethod
     def run(cls, args, stdin=""):
-        popen = subprocess.Popen([sys.executable, "-m", cls.YOSYS_PACKAGE, *args],
+        popen = subprocess.Popen([*cls._argv(), *args],
             stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-            encoding="utf-8")
-        stdout, stderr = popen.communicate(stdin)
+            **_pipe_popen_kwargs())
+        _grow_pipes(popen)
+        stdout, stderr = _communicate(popen, stdin)
         if popen.returncode:
             raise YosysError(stderr.strip())
         else:
@@ -109,32 +354,44 @@ class _SystemYosys(YosysBinary):
 
     @classmethod
     def available(cls):
-        return has_tool(cls.YOSYS_BINARY)
+        return _cached_has_tool(cls.YOSYS_BINARY)
 
     @classmethod
     def version(cls):
         version = cls.run(["-V"])
-        match = re.match(r"^Yosys (\d+)\.(\d+)(?:\+(\d+))?", version)
+        match = _SYSTEM_VER_RE.match(version)
         return (int(match[1]), int(match[2]), int(match[3] or 0))
 
+    @classmethod
+    def _argv(cls):
+        return [require_tool(cls.YOSYS_BINARY)]
+
     @classmethod
     def run(cls, args, stdin=""):
-        popen = subprocess.Popen([require_tool(cls.YOSYS_BINARY), *args],
+        popen = subprocess.Popen([*cls._argv(), *args],
             stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-            encoding="utf-8")
-        stdout, stderr = popen.communicate(stdin)
+            **_pipe_popen_kwargs())
+        _grow_pipes(popen)
+        stdout, stderr = _communicate(popen, stdin)
         # If Yosys is built with an evaluation version of Verific, then Verific license
         # information is printed first. It consists of empty lines and lines starting with `--`,
         # which are not normally a part of Yosys output, and can be fairly safely removed.
         #
         # This is not ideal, but Verific license conditions rule out any other solution.
-        stdout = re.sub(r"\A(-- .+\n|\n)*", "", stdout)
+        #
+        # The check avoids copying a potentially multi-megabyte log through the regex engine
+        # in the usual case where Yosys is not built with Verific at all.
+        if stdout.startswith(("-- ", "\n")):
+            stdout = _VERIFIC_HDR_RE.sub("", stdout)
         if popen.returncode:
             raise YosysError(stderr.strip())
         else:
             return stdout
 
 
+_find_yosys_cache = {}
+
+
 def find_yosys(requirement):
     """Find an available Yosys executable of required version.
 
@@ -155,6 +412,23 @@ def find_yosys(requirement):
     """
     proxies = []
     clauses = os.environ.get("NMIGEN_USE_YOSYS", "system,builtin").split(",")
+    # Probing is expensive even with cached metadata, since the system Yosys has to be run to
+    # discover its version. The outcome can only change if the environment variable changes, or
+    # if a different version is demanded; requirements are passed as (usually identical) lambdas,
+    # so compare their code rather than their identity. The demanded version can also live in
+    # captured cells or defaults rather than in the constants, so those are part of the key too.
+    # Use find_yosys.cache_clear() to re-probe.
+    try:
+        closure = ()
+        if requirement.__closure__ is not None:
+            closure = tuple(cell.cell_contents for cell in requirement.__closure__)
+        cache_key = (tuple(clauses), requirement.__code__.co_code, requirement.__code__.co_consts,
+                     requirement.__defaults__, closure)
+        hash(cache_key)
+    except (AttributeError, TypeError, ValueError):
+        cache_key = None # not a plain function, or captures unhashable state; don't cache
+    if cache_key is not None and cache_key in _find_yosys_cache:
+        return _find_yosys_cache[cache_key]
     for clause in clauses:
         if clause == "builtin":
             proxies.append(_BuiltinYosys)
@@ -166,6 +440,8 @@ def find_yosys(requirement):
                              .format(clause))
     for proxy in proxies:
         if proxy.available() and requirement(proxy.version()):
+            if cache_key is not None:
+                _find_yosys_cache[cache_key] = proxy
             return proxy
     else:
         if "NMIGEN_USE_YOSYS" in os.environ:
@@ -174,3 +450,15 @@ def find_yosys(requirement):
         else:
             raise YosysError("Could not find an acceptable Yosys binary. The `nmigen_yosys` PyPI "
                              "package, if available for this platform, can be used as fallback")
+
+
+def _find_yosys_cache_clear():
+    # The resolution cache layers on the metadata, PATH and script-location caches; a re-probe
+    # is only complete if all of them are dropped, or available() keeps returning stale results
+    # for a Yosys installed after the first probe.
+    _find_yosys_cache.clear()
+    _dist_version.cache_clear()
+    _cached_has_tool.cache_clear()
+    _dist_script.cache_clear()
+
+find_yosys.cache_clear = _find_yosys_cache_clear
@@ -1,6 +1,7 @@
 from collections import OrderedDict
 from abc import ABCMeta, abstractmethod, abstractproperty
 import os
+import functools
 import textwrap
 import re
 import jinja2
@@ -18,6 +19,15 @@ from .run import *
 __all__ = ["Platform", "TemplatedPlatform"]
 
 
+# Platform templates are fixed strings defined in class bodies, but they are rendered once per
+# build, and Jinja compilation is not free; cache the compiled form so that repeated builds (and
+# the build script templates shared between all platforms) only pay for rendering.
+@functools.lru_cache(maxsize=None)
+def _compile_template(source):
+    return jinja2.Template(source,
+        trim_blocks=True, lstrip_blocks=True, undefined=jinja2.StrictUndefined)
+
+
 class Platform(ResourceManager, metaclass=ABCMeta):
     resources      = abstractproperty()
     connectors     = abstractproperty()
@@ -31,6 +41,7 @@ class Platform(ResourceManager, metaclass=ABCMeta):
         self.extra_files = OrderedDict()
 
         self._prepared   = False
+        self._files_by_suffix = {}
 
     @property
     def default_clk_constraint(self):
@@ -62,6 +73,7 @@ class Platform(ResourceManager, metaclass=ABCMeta):
                                  .format(filename))
         else:
             self.extra_files[filename] = content
+            self._files_by_suffix.clear()
 
     @property
     def _toolchain_env_var(self):
@@ -406,8 +418,7 @@ class TemplatedPlatform(Platform):
         def render(source, origin, syntax=None):
             try:
                 source   = textwrap.dedent(source).strip()
-                compiled = jinja2.Template(source,
-                    trim_blocks=True, lstrip_blocks=True, undefined=jinja2.StrictUndefined)
+                compiled = _compile_template(source)
                 compiled.environment.filters["options"] = options
                 compiled.environment.filters["hierarchy"] = hierarchy
                 compiled.environment.filters["ascii_escape"] = ascii_escape
@@ -431,13 +442,40 @@ class TemplatedPlatform(Platform):
                 "autogenerated": autogenerated,
             })
 
+        # Emitted RTLIL and Verilog run into megabytes for large designs; interpolating them
+        # through Jinja buffers the whole output a second time inside the template engine. All
+        # templates that embed a design are a (rendered) header followed by a lone emitter call,
+        # so recognize that shape and append the emitted text directly.
+        passthrough_emitters = {
+            "{{emit_rtlil()}}":         emit_rtlil,
+            "{{emit_verilog()}}":       emit_verilog,
+            "{{emit_debug_verilog()}}": emit_debug_verilog,
+        }
+
+        def render_file(source, origin):
+            source = textwrap.dedent(source).strip()
+            header, _, last_line = source.rpartition("\n")
+            if last_line in passthrough_emitters:
+                emitted = passthrough_emitters[last_line]()
+                if header:
+                    return render(header, origin=origin) + "\n" + emitted
+                return emitted
+            return render(source, origin=origin)
+
         plan = BuildPlan(script="build_{}".format(name))
         for filename_tpl, content_tpl in self.file_templates.items():
             plan.add_file(render(filename_tpl, origin=filename_tpl),
-                          render(content_tpl, origin=content_tpl))
+                          render_file(content_tpl, origin=content_tpl))
         for filename, content in self.extra_files.items():
             plan.add_file(filename, content)
         return plan
 
     def iter_extra_files(self, *endswith):
-        return (f for f in self.extra_files if f.endswith(endswith))
+        # The file templates filter the same file list several times (once per language); scan
+        # it only once per suffix set, since the result cannot change while a build is rendered.
+        try:
+            files = self._files_by_suffix[endswith]
+        except KeyError:
+            files = self._files_by_suffix[endswith] = \
+                [f for f in self.extra_files if f.endswith(endswith)]
+        return iter(files)
@@ -0,0 +1,83 @@
+import sys
+
+from .._yosys import YosysBinary, YosysError, _YosysSession
+from .utils import *
+
+
+class _EchoYosys(YosysBinary):
+    """Stand-in for a Yosys invocation: interprets ``log`` and ``design -reset`` the way Yosys
+    script mode does, and echoes every other command."""
+    @classmethod
+    def run(cls, args, stdin=""):
+        output = []
+        for line in stdin.splitlines():
+            if line.startswith("log "):
+                output.append(line[len("log "):] + "\n")
+            elif line == "design -reset":
+                output.append("(reset)\n")
+            elif line:
+                output.append("ran " + line + "\n")
+        return "".join(output)
+
+
+class _MuteYosys(YosysBinary):
+    """Stand-in for a Yosys whose log output is suppressed, e.g. by a stray ``-q`` option."""
+    @classmethod
+    def run(cls, args, stdin=""):
+        return ""
+
+
+class RunScriptsTestCase(FHDLTestCase):
+    def test_outputs_in_order(self):
+        self.assertEqual(_EchoYosys.run_scripts(["synth_a", "synth_b\nwrite_json b.json"]), [
+            "ran synth_a\n",
+            "(reset)\nran synth_b\nran write_json b.json\n",
+        ])
+
+    def test_empty(self):
+        self.assertEqual(_EchoYosys.run_scripts([]), [])
+
+    def test_missing_delimiter(self):
+        with self.assertRaises(YosysError,
+                msg="Yosys output is missing the delimiter of script 0"):
+            _MuteYosys.run_scripts(["synth_a"])
+
+
+# A minimal interactive Yosys stand-in: reads commands from standard input, understands ``log``
+# and ``design -reset``, and dies with a diagnostic on ``die``. The trailing "-" argument that
+# _YosysSession appends lands in sys.argv, where it is ignored, same as by `yosys -`.
+_FAKE_YOSYS_ARGV = [sys.executable, "-c", """
+import sys
+for line in sys.stdin:
+    line = line.rstrip("\\n")
+    if line.startswith("log "):
+        print(line[len("log "):], flush=True)
+    elif line == "die":
+        sys.stderr.write("fake yosys: fatal error\\n")
+        sys.exit(1)
+    elif line and line != "design -reset":
+        print("ran " + line, flush=True)
+"""]
+
+
+class YosysSessionTestCase(FHDLTestCase):
+    def test_send(self):
+        with _YosysSession(_FAKE_YOSYS_ARGV) as session:
+            self.assertEqual(session.send("synth_a"), "ran synth_a\n")
+            self.assertEqual(session.send("synth_b\nsynth_c"),
+                             "ran synth_b\nran synth_c\n")
+
+    def test_dies_mid_script(self):
+        with _YosysSession(_FAKE_YOSYS_ARGV) as session:
+            with self.assertRaises(YosysError,
+                    msg="fake yosys: fatal error"):
+                session.send("die")
+            with self.assertRaises(YosysError,
+                    msg="Yosys session terminated unexpectedly"):
+                session.send("synth_a")
+
+    def test_close_idempotent(self):
+        session = _YosysSession(_FAKE_YOSYS_ARGV)
+        self.assertEqual(session.send("synth_a"), "ran synth_a\n")
+        session.close()
+        session.close()